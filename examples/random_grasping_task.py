@@ -6,11 +6,23 @@ from library.rgb_object_tracker import (
 from library.utils import OrderType, pick_random_positions, get_undistorted_bottom_image, clear_center, manual_control
 import numpy as np
 from typing import List, Tuple
+import logging
 import time
 import random
 
+logger = logging.getLogger(__name__)
+
 
 class RandomGrasper(AutograsperBase):
+    __slots__ = (
+        "colors",
+        "block_heights",
+        "position_bank",
+        "stack_position",
+        "object_size",
+        "time_between_orders",
+    )
+
     def __init__(
         self,
         args,
@@ -88,12 +100,12 @@ class RandomGrasper(AutograsperBase):
             and np.linalg.norm(np.array(random_position) - np.array(object_position)) < 0.12
         ):
             self.failed = False
-            print("succesful grasp")
+            logger.info("succesful grasp")
         else:
-            print("failed grasp")
+            logger.info("failed grasp")
             self.failed = True
 
-        print("task complete")
+        logger.info("task complete")
 
     def generate_new_block_position(self):
         import random
@@ -5,11 +5,22 @@ from library.rgb_object_tracker import (
 )
 from library.utils import OrderType, pick_random_positions, get_undistorted_bottom_image
 import numpy as np
+import logging
 import time
 from typing import List, Tuple
 
+logger = logging.getLogger(__name__)
+
 
 class StackingAutograsper(AutograsperBase):
+    __slots__ = (
+        "colors",
+        "block_heights",
+        "position_bank",
+        "stack_position",
+        "object_size",
+    )
+
     def __init__(
         self,
         args,
@@ -79,7 +90,9 @@ class StackingAutograsper(AutograsperBase):
                     self.bottom_image, self.robot_idx, color, debug=True
                 )
             except ValueError as e:
-                print(f"Error finding object position for color '{color}': {e}")
+                logger.error(
+                    "Error finding object position for color '%s': %s", color, e
+                )
                 self.failed = True
                 return  # Exit the function if an object is not found
 
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
+import logging
 import os
 import sys
+import threading
 import time
 from enum import Enum
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import numpy as np
 from dotenv import load_dotenv
@@ -20,6 +22,8 @@ from library.utils import OrderType, queue_orders, clear_center
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class RobotActivity(Enum):
     ACTIVE = 1
@@ -29,6 +33,26 @@ class RobotActivity(Enum):
 
 
 class AutograsperBase(ABC):
+    __slots__ = (
+        "token",
+        "output_dir",
+        "start_time",
+        "failed",
+        "consecutive_errors",
+        "camera_matrix",
+        "distortion_coefficients",
+        "_state_cv",
+        "_state",
+        "start_event",
+        "shutdown_event",
+        "robot",
+        "robot_idx",
+        "bottom_image",
+    )
+
+    # Consecutive perform_task exceptions tolerated before run_grasping gives up
+    MAX_CONSECUTIVE_ERRORS = 5
+
     def __init__(
         self,
         args,
@@ -43,6 +67,7 @@ class AutograsperBase(ABC):
         self.output_dir = output_dir
         self.start_time = time.time()
         self.failed = False
+        self.consecutive_errors = 0
 
         # Camera calibration parameters
         if camera_matrix is None or distortion_coefficients is None:
@@ -50,11 +75,32 @@ class AutograsperBase(ABC):
         self.camera_matrix = camera_matrix
         self.distortion_coefficients = distortion_coefficients
 
-        self.state = RobotActivity.STARTUP
-        self.start_flag = False
+        self._state_cv = threading.Condition()
+        self._state = RobotActivity.STARTUP
+        self.start_event = threading.Event()
+        self.shutdown_event = threading.Event()
 
         self.robot = self.initialize_robot(args.robot_idx, self.token)
         self.robot_idx = args.robot_idx
+        self.bottom_image = None
+
+    @property
+    def state(self) -> RobotActivity:
+        return self._state
+
+    @state.setter
+    def state(self, state: RobotActivity):
+        with self._state_cv:
+            self._state = state
+            self._state_cv.notify_all()
+
+    def wait_for_state_change(
+        self, previous_state: RobotActivity, timeout: Optional[float] = None
+    ) -> RobotActivity:
+        """Block until the state differs from previous_state or timeout expires."""
+        with self._state_cv:
+            self._state_cv.wait_for(lambda: self._state != previous_state, timeout)
+            return self._state
 
     @staticmethod
     def initialize_robot(robot_idx: int, token: str) -> GripperRobot:
@@ -64,25 +110,35 @@ class AutograsperBase(ABC):
             raise ValueError("Invalid robot ID or token") from e
 
     def queue_robot_orders(self, orders: List[Tuple[OrderType, List]], delay: float=1):
-        queue_orders(self.robot, orders, delay, output_dir=self.output_dir)
+        queue_orders(
+            self.robot,
+            orders,
+            delay,
+            output_dir=self.output_dir,
+            shutdown_event=self.shutdown_event,
+        )
 
     def startup(self, position: List[float]):
         self.robot.rotate(0)
-        time.sleep(0.5)
+        self.shutdown_event.wait(0.5)
         startup_commands = [
             (OrderType.GRIPPER_OPEN, []),
             (OrderType.MOVE_Z, [1]),
             (OrderType.MOVE_XY, position),
         ]
         self.queue_robot_orders(startup_commands, 1)
-        time.sleep(2)
+        self.shutdown_event.wait(2)
 
     def recover_after_fail(self):
-        clear_center(self.robot)
+        clear_center(self.robot, shutdown_event=self.shutdown_event)
 
     def wait_for_start_signal(self):
-        while not self.start_flag:
-            time.sleep(0.1)
+        # shutdown() also sets start_event, so this never outlives a shutdown
+        self.start_event.wait()
+
+    def shutdown(self):
+        self.shutdown_event.set()
+        self.start_event.set()
 
     def go_to_start(self):
         positions = [[1, 0.7], [0, 0.7]]
@@ -96,29 +152,45 @@ class AutograsperBase(ABC):
         self.robot.gripper_close()
 
     def run_grasping(self):
-        while self.state != RobotActivity.FINISHED:
+        while (
+            self.state != RobotActivity.FINISHED
+            and not self.shutdown_event.is_set()
+        ):
             self.go_to_start()
+
+            # Clear before announcing ACTIVE so the coordinator's start signal
+            # for this round can't be lost; recheck shutdown since clearing
+            # may have swallowed the wakeup set by shutdown().
+            self.start_event.clear()
+            if self.shutdown_event.is_set():
+                break
             self.state = RobotActivity.ACTIVE
 
             self.wait_for_start_signal()
-            self.start_flag = False
+            if self.shutdown_event.is_set():
+                break
 
             # Call task-specific method
             try:
                 self.perform_task()
-            except ValueError as e:
-                print(f"Error during perform_task: {e}")
+                self.consecutive_errors = 0
+            except Exception:
+                logger.exception("perform_task failed")
                 self.failed = True
-            except Exception as e:
-                print(f"Unexpected error during perform_task: {e}")
-                raise
+                self.consecutive_errors += 1
+                if self.consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+                    raise RuntimeError(
+                        f"perform_task failed {self.consecutive_errors} times in a row"
+                    )
 
-            time.sleep(2)
+            self.shutdown_event.wait(2)
             self.state = RobotActivity.RESETTING
-            time.sleep(2)
+            self.shutdown_event.wait(2)
+            if self.shutdown_event.is_set():
+                break
 
             if self.failed:
-                print("Experiment failed, recovering")
+                logger.info("Experiment failed, recovering")
                 self.recover_after_fail()
                 self.failed = False
             else:
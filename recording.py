@@ -3,7 +3,8 @@ import sys
 import time
 import json
 import logging
-from typing import Any, Tuple, List, Dict
+import threading
+from typing import Any, Tuple, List, Dict, Optional
 import cv2
 
 # Ensure project root is in sys.path
@@ -25,6 +26,9 @@ logging.basicConfig(level=logging.INFO)
 class Recorder:
     FPS = 2
     FOURCC = cv2.VideoWriter_fourcc(*"mp4v")
+    # Buffered state lines are written out after this many or this many seconds
+    STATE_FLUSH_COUNT = 32
+    STATE_FLUSH_INTERVAL = 5.0
 
     def __init__(
         self, session_id: str, output_dir: str, m: Any, d: Any, token: str, idx: str
@@ -40,10 +44,18 @@ class Recorder:
         self.video_counter = 0
         self.video_writer_top = None
         self.video_writer_bottom = None
+        self._frame_cv = threading.Condition()
+        self._state_lock = threading.Lock()
+        self._state_log = None
+        self._state_log_dir = None
+        self._state_batch: List[str] = []
+        self._state_last_flush = time.monotonic()
 
         self.robot = GripperRobot(self.robot_idx, self.token)
         self.image_top, _ = self.robot.get_image_top()
-        self.bottom_image = get_undistorted_bottom_image(self.robot, self.m, self.d)
+        self._publish_bottom_image(
+            get_undistorted_bottom_image(self.robot, self.m, self.d)
+        )
         self.pause = False
 
         self._initialize_directories()
@@ -103,6 +115,7 @@ class Recorder:
             logging.error("An error occurred: %s", e)
         finally:
             self._release_writers()
+            self._close_state_log()
             cv2.destroyAllWindows()
     
     def _update(self) -> None:
@@ -110,24 +123,48 @@ class Recorder:
         data = self.robot.get_all_states()
 
         self.image_top = data[0]
-        self.bottom_image = get_undistorted_bottom_image(self.robot, self.m, self.d)
+        self._publish_bottom_image(
+            get_undistorted_bottom_image(self.robot, self.m, self.d)
+        )
         self.timestamp = data[3]
         self.state = data[2]
 
+    def _publish_bottom_image(self, image) -> None:
+        """Publish a freshly captured bottom image for other threads.
+
+        Every frame is a new array, so consumers can share the reference
+        without copying. It is marked read-only so accidental in-place
+        mutation raises instead of corrupting other readers.
+        """
+        image.flags.writeable = False
+        with self._frame_cv:
+            self.bottom_image = image
+            self._frame_cv.notify_all()
+
+    def wait_for_bottom_image(
+        self, previous_image: Any, timeout: Optional[float] = None
+    ) -> Any:
+        """Block until a bottom image other than previous_image is published."""
+        with self._frame_cv:
+            self._frame_cv.wait_for(
+                lambda: self.bottom_image is not previous_image, timeout
+            )
+            return self.bottom_image
+
     def _capture_frame(self) -> None:
         """Capture frames from the robot's cameras and write directly to video file."""
-        try:
-            image_top = self.image_top
-            bottom_image = self.bottom_image
+        image_top = self.image_top
+        bottom_image = self.bottom_image
 
-            if self.video_writer_top and self.video_writer_bottom:
-                self.video_writer_top.write(image_top)
-                self.video_writer_bottom.write(bottom_image)
-            else:
-                logging.warning("Video writers not initialized.")
+        if not (self.video_writer_top and self.video_writer_bottom):
+            logging.warning("Video writers not initialized.")
+            return
 
-        except Exception as e:
-            logging.error("Error capturing frame: %s", e)
+        try:
+            self.video_writer_top.write(image_top)
+            self.video_writer_bottom.write(bottom_image)
+        except cv2.error as e:
+            logging.error("Error writing video frame: %s", e)
 
     def _start_or_restart_video_writers(self) -> None:
         """Start or restart video writers."""
@@ -168,29 +205,84 @@ class Recorder:
         self.video_counter = 0
         self.stop_flag = False
         self._start_or_restart_video_writers()
+        self._open_state_log()
 
     def stop(self) -> None:
         """Set the stop flag to terminate recording."""
         self.stop_flag = True
         logging.info("Stop flag set to True")
 
+    def _open_state_log(self) -> None:
+        """Start appending states to states.jsonl in the current output directory."""
+        # Close and reopen under one lock hold so no state is dropped in
+        # between and concurrent callers can't orphan a handle.
+        with self._state_lock:
+            self._close_state_log_locked()
+            self._state_log_dir = self.output_dir
+            self._state_log = open(
+                os.path.join(self.output_dir, "states.jsonl"), "a"
+            )
+            self._state_last_flush = time.monotonic()
+
+    def _close_state_log(self) -> None:
+        """Close the state log and fold it into states.json."""
+        with self._state_lock:
+            self._close_state_log_locked()
+
+    def _close_state_log_locked(self) -> None:
+        """Close the state log and fold it into states.json. Caller holds _state_lock."""
+        if self._state_log is None:
+            return
+        self._flush_state_batch()
+        self._state_log.close()
+        self._state_log = None
+        try:
+            self._collapse_state_log(self._state_log_dir)
+        except Exception as e:
+            logging.error("Error writing states.json: %s", e)
+
+    @staticmethod
+    def _collapse_state_log(output_dir: str) -> None:
+        """Merge states.jsonl into states.json, keeping the list-of-states format."""
+        log_file = os.path.join(output_dir, "states.jsonl")
+        state_file = os.path.join(output_dir, "states.json")
+        data: List[Dict[str, Any]] = []
+
+        if os.path.exists(state_file):
+            with open(state_file, "r") as file:
+                data = json.load(file)
+
+        with open(log_file, "r") as file:
+            data.extend(json.loads(line) for line in file if line.strip())
+
+        with open(state_file, "w") as file:
+            json.dump(data, file, indent=4)
+        os.remove(log_file)
+
     def save_state(self, robot: GripperRobot) -> None:
-        """Save the state of the robot to a JSON file."""
+        """Append the state of the robot to the episode's state log."""
         try:
             state, timestamp = self.state, self.timestamp
             state = convert_ndarray_to_list(state)
             state["time"] = timestamp
+            line = json.dumps(state, separators=(",", ":")) + "\n"
 
-            state_file = os.path.join(self.output_dir, "states.json")
-            data: List[Dict[str, Any]] = []
-
-            if os.path.exists(state_file):
-                with open(state_file, "r") as file:
-                    data = json.load(file)
-
-            data.append(state)
-
-            with open(state_file, "w") as file:
-                json.dump(data, file, indent=4)
+            with self._state_lock:
+                if self._state_log is None:
+                    return
+                self._state_batch.append(line)
+                if (
+                    len(self._state_batch) >= self.STATE_FLUSH_COUNT
+                    or time.monotonic() - self._state_last_flush
+                    >= self.STATE_FLUSH_INTERVAL
+                ):
+                    self._flush_state_batch()
         except Exception as e:
             logging.error("Error saving state: %s", e)
+
+    def _flush_state_batch(self) -> None:
+        """Write buffered state lines to the log. Caller holds _state_lock."""
+        self._state_log.writelines(self._state_batch)
+        self._state_log.flush()
+        self._state_batch.clear()
+        self._state_last_flush = time.monotonic()
@@ -1,6 +1,7 @@
 import argparse
 import configparser
 import os
+from functools import lru_cache
 
 import cv2
 import numpy as np
@@ -16,9 +17,31 @@ def load_color_ranges(config_file="library/color_config.ini"):
     """
     Load color ranges from a configuration file.
 
+    The parsed result is cached until the file changes, so callers share it
+    and must not modify it.
+
     Parameters:
         config_file (str): Path to the configuration file.
 
+    Returns:
+        dict: A dictionary with color ranges.
+    """
+    try:
+        mtime = os.path.getmtime(config_file)
+    except OSError:
+        mtime = None
+    return _parse_color_ranges(os.path.abspath(config_file), mtime)
+
+
+@lru_cache(maxsize=8)
+def _parse_color_ranges(config_file, mtime):
+    """
+    Parse color ranges from a configuration file, cached per path and mtime.
+
+    Parameters:
+        config_file (str): Absolute path to the configuration file.
+        mtime (float): Modification time of the file, used as cache key.
+
     Returns:
         dict: A dictionary with color ranges.
     """
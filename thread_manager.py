@@ -1,11 +1,14 @@
 import argparse
 import logging
+import logging.handlers
 import os
+import queue
+import signal
 import threading
-import time
 import traceback
 from configparser import ConfigParser
 from typing import Optional, Tuple
+import cv2
 import numpy as np
 from examples.stacking_autograsper import StackingAutograsper, RobotActivity
 from examples.random_grasping_task import RandomGrasper
@@ -17,8 +20,7 @@ from library.rgb_object_tracker import all_objects_are_visible
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-STATE_LOCK = threading.Lock()
-BOTTOM_IMAGE_LOCK = threading.Lock()
+STATE_CONDITION = threading.Condition()
 ERROR_EVENT = threading.Event()
 
 
@@ -28,6 +30,10 @@ class SharedState:
         self.recorder: Optional[Recorder] = None
         self.recorder_thread: Optional[threading.Thread] = None
         self.bottom_image_thread: Optional[threading.Thread] = None
+        self.next_session_id: Optional[int] = None
+        self.session_dir = ""
+        self.task_dir = ""
+        self.restore_dir = ""
 
 
 shared_state = SharedState()
@@ -42,20 +48,43 @@ def load_config(config_file: str = "autograsper/config.ini") -> ConfigParser:
 def get_new_session_id(base_dir: str) -> int:
     if not os.path.exists(base_dir):
         return 1
-    session_ids = [
-        int(dir_name) for dir_name in os.listdir(base_dir) if dir_name.isdigit()
-    ]
-    return max(session_ids, default=0) + 1
+    max_session_id = 0
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            if entry.name.isdigit():
+                max_session_id = max(max_session_id, int(entry.name))
+    return max_session_id + 1
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Move root log handlers behind a queue so worker threads only enqueue."""
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *root_logger.handlers, respect_handler_level=True
+    )
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
 
 
 def handle_error(exception: Exception) -> None:
-    logger.error(f"Error occurred: {exception}")
+    logger.error("Error occurred: %s", exception)
     logger.error(traceback.format_exc())
     ERROR_EVENT.set()
 
 
+def spawn_thread(target, *args) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
 def run_autograsper(autograsper: StackingAutograsper) -> None:
+    try:
         autograsper.run_grasping()
+    except Exception as e:
+        handle_error(e)
 
 
 def setup_recorder(output_dir: str, robot_idx: str, config: ConfigParser) -> Recorder:
@@ -79,13 +108,17 @@ def run_recorder(recorder: Recorder) -> None:
 
 def monitor_state(autograsper: StackingAutograsper, shared_state: SharedState) -> None:
     try:
+        last_state = shared_state.state
         while not ERROR_EVENT.is_set():
-            with STATE_LOCK:
-                if shared_state.state != autograsper.state:
-                    shared_state.state = autograsper.state
-                    if shared_state.state == RobotActivity.FINISHED:
-                        break
-            time.sleep(0.1)
+            current_state = autograsper.wait_for_state_change(last_state, timeout=1.0)
+            if current_state == last_state:
+                continue
+            with STATE_CONDITION:
+                shared_state.state = current_state
+                STATE_CONDITION.notify_all()
+            last_state = current_state
+            if current_state == RobotActivity.FINISHED:
+                break
     except Exception as e:
         handle_error(e)
 
@@ -96,18 +129,22 @@ def is_stacking_successful(recorder: Recorder, colors) -> bool:
 
 def monitor_bottom_image(recorder: Recorder, autograsper: StackingAutograsper) -> None:
     try:
-        while not ERROR_EVENT.is_set():
-            if recorder and recorder.bottom_image is not None:
-                with BOTTOM_IMAGE_LOCK:
-                    autograsper.bottom_image = np.copy(recorder.bottom_image)
-            time.sleep(0.1)
+        bottom_image = None
+        while not ERROR_EVENT.is_set() and not recorder.stop_flag:
+            # Recorder publishes a new read-only array per frame, so
+            # sharing the reference is race-free without a copy.
+            bottom_image = recorder.wait_for_bottom_image(bottom_image, timeout=1.0)
+            autograsper.bottom_image = bottom_image
     except Exception as e:
         handle_error(e)
 
 
-def create_new_data_point(script_dir: str) -> Tuple[str, str, str]:
-    recorded_data_dir = os.path.join(script_dir, "recorded_data")
-    new_session_id = get_new_session_id(recorded_data_dir)
+def create_new_data_point(recorded_data_dir: str) -> Tuple[str, str, str]:
+    # Scan the directory once, then count locally for later data points
+    if shared_state.next_session_id is None:
+        shared_state.next_session_id = get_new_session_id(recorded_data_dir)
+    new_session_id = shared_state.next_session_id
+    shared_state.next_session_id += 1
     new_session_dir = os.path.join(recorded_data_dir, str(new_session_id))
     task_dir = os.path.join(new_session_dir, "task")
     restore_dir = os.path.join(new_session_dir, "restore")
@@ -136,7 +173,9 @@ def initialize(
     import ast
 
     config = load_config(args.config)
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    recorded_data_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "recorded_data"
+    )
 
     # Check if 'experiment' and 'camera' sections exist
     if "experiment" not in config:
@@ -158,7 +197,7 @@ def initialize(
         camera_matrix = np.array(ast.literal_eval(config["camera"]["m"]))
         distortion_coefficients = np.array(ast.literal_eval(config["camera"]["d"]))
     except Exception as e:
-        print(f"Error parsing camera calibration parameters: {e}")
+        logger.error("Error parsing camera calibration parameters: %s", e)
         raise
 
     autograsper = RandomGrasper(
@@ -172,116 +211,145 @@ def initialize(
         camera_matrix=camera_matrix,
         distortion_coefficients=distortion_coefficients,
     )
-    return autograsper, config, script_dir
+    return autograsper, config, recorded_data_dir
 
 
 def start_threads(
     autograsper: StackingAutograsper,
 ) -> Tuple[threading.Thread, threading.Thread]:
+    autograsper_thread = spawn_thread(run_autograsper, autograsper)
+    monitor_thread = spawn_thread(monitor_state, autograsper, shared_state)
+    return autograsper_thread, monitor_thread
 
-    autograsper_thread = threading.Thread(
-        target=run_autograsper,
-        args=(autograsper,),
-    )
-    monitor_thread = threading.Thread(
-        target=monitor_state, args=(autograsper, shared_state)
-    )
 
-    autograsper_thread.start()
-    monitor_thread.start()
+def on_active_state(
+    autograsper: StackingAutograsper,
+    config: ConfigParser,
+    recorded_data_dir: str,
+    args: argparse.Namespace,
+) -> None:
+    (
+        shared_state.session_dir,
+        shared_state.task_dir,
+        shared_state.restore_dir,
+    ) = create_new_data_point(recorded_data_dir)
+    autograsper.output_dir = shared_state.task_dir
+
+    if not shared_state.recorder:
+        shared_state.recorder = setup_recorder(
+            shared_state.task_dir, args.robot_idx, config
+        )
+        shared_state.recorder_thread = spawn_thread(
+            run_recorder, shared_state.recorder
+        )
+        shared_state.bottom_image_thread = spawn_thread(
+            monitor_bottom_image, shared_state.recorder, autograsper
+        )
 
-    return autograsper_thread, monitor_thread
+    shared_state.recorder.start_new_recording(shared_state.task_dir)
+    ERROR_EVENT.wait(0.5)
+    autograsper.start_event.set()
+
+
+def on_resetting_state(
+    autograsper: StackingAutograsper,
+    config: ConfigParser,
+    recorded_data_dir: str,
+    args: argparse.Namespace,
+) -> None:
+    # this is for STACKING. TODO: generalize this functionality
+    # status_message = (
+    #     "success"
+    #     if is_stacking_successful(
+    #         shared_state.recorder, autograsper.colors
+    #     )
+    #     else "fail"
+    # )
+    # if status_message == "fail":
+    #     autograsper.failed = True
+
+    if autograsper.failed:
+        status_message = "fail"
+    else:
+        status_message = "success"
+
+    logger.info(status_message)
+    with open(
+        os.path.join(shared_state.session_dir, "status.txt"), "w"
+    ) as status_file:
+        status_file.write(status_message)
+
+    autograsper.output_dir = shared_state.restore_dir
+    shared_state.recorder.start_new_recording(shared_state.restore_dir)
+
+
+def on_finished_state(
+    autograsper: StackingAutograsper,
+    config: ConfigParser,
+    recorded_data_dir: str,
+    args: argparse.Namespace,
+) -> None:
+    if shared_state.recorder:
+        shared_state.recorder.stop()
+        ERROR_EVENT.wait(1)
+        shared_state.recorder_thread.join()
+        shared_state.bottom_image_thread.join()
+
+
+STATE_HANDLERS = {
+    RobotActivity.ACTIVE: on_active_state,
+    RobotActivity.RESETTING: on_resetting_state,
+    RobotActivity.FINISHED: on_finished_state,
+}
 
 
 def handle_state_changes(
     autograsper: StackingAutograsper,
     config: ConfigParser,
-    script_dir: str,
+    recorded_data_dir: str,
     args: argparse.Namespace,
 ) -> None:
     prev_robot_activity = RobotActivity.STARTUP
-    session_dir, task_dir, restore_dir = "", "", ""
 
     while not ERROR_EVENT.is_set():
-        with STATE_LOCK:
-            if shared_state.state != prev_robot_activity:
-                if (
-                    prev_robot_activity != RobotActivity.STARTUP
-                    and shared_state.recorder
-                ):
-                    shared_state.recorder.write_final_image()
-
-                if shared_state.state == RobotActivity.STARTUP and prev_robot_activity != RobotActivity.STARTUP:
-                    shared_state.recorder.pause = True
-                    time.sleep(10)
-                    shared_state.recorder.pause = False
-
-                if shared_state.state == RobotActivity.ACTIVE:
-                    session_dir, task_dir, restore_dir = create_new_data_point(
-                        script_dir
-                    )
-                    autograsper.output_dir = task_dir
-
-                    if not shared_state.recorder:
-                        shared_state.recorder = setup_recorder(
-                            task_dir, args.robot_idx, config
-                        )
-                        shared_state.recorder_thread = threading.Thread(
-                            target=run_recorder, args=(shared_state.recorder,)
-                        )
-                        shared_state.recorder_thread.start()
-                        shared_state.bottom_image_thread = threading.Thread(
-                            target=monitor_bottom_image,
-                            args=(shared_state.recorder, autograsper),
-                        )
-                        shared_state.bottom_image_thread.start()
-
-                    shared_state.recorder.start_new_recording(task_dir)
-                    time.sleep(0.5)
-                    autograsper.start_flag = True
-
-                elif shared_state.state == RobotActivity.RESETTING:
-
-                    # this is for STACKING. TODO: generalize this functionality
-                    # status_message = (
-                    #     "success"
-                    #     if is_stacking_successful(
-                    #         shared_state.recorder, autograsper.colors
-                    #     )
-                    #     else "fail"
-                    # )
-                    # if status_message == "fail":
-                    #     autograsper.failed = True
-
-                    if autograsper.failed:
-                        status_message = "fail"
-                    else:
-                        status_message = "success"
-
-                    logger.info(status_message)
-                    with open(
-                        os.path.join(session_dir, "status.txt"), "w"
-                    ) as status_file:
-                        status_file.write(status_message)
-
-                    autograsper.output_dir = restore_dir
-                    shared_state.recorder.start_new_recording(restore_dir)
-
-                prev_robot_activity = shared_state.state
-
-            if shared_state.state == RobotActivity.FINISHED:
-                if shared_state.recorder:
-                    shared_state.recorder.stop()
-                    time.sleep(1)
-                    shared_state.recorder_thread.join()
-                    shared_state.bottom_image_thread.join()
+        with STATE_CONDITION:
+            STATE_CONDITION.wait_for(
+                lambda: shared_state.state != prev_robot_activity
+                or ERROR_EVENT.is_set(),
+                timeout=1.0,
+            )
+            if shared_state.state == prev_robot_activity:
+                continue
+
+            if (
+                prev_robot_activity != RobotActivity.STARTUP
+                and shared_state.recorder
+            ):
+                shared_state.recorder.write_final_image()
+
+            if shared_state.state == RobotActivity.STARTUP and prev_robot_activity != RobotActivity.STARTUP:
+                shared_state.recorder.pause = True
+                ERROR_EVENT.wait(10)
+                shared_state.recorder.pause = False
+
+            handler = STATE_HANDLERS.get(shared_state.state)
+            if handler:
+                handler(autograsper, config, recorded_data_dir, args)
+
+            prev_robot_activity = shared_state.state
+            if prev_robot_activity == RobotActivity.FINISHED:
                 break
 
 
 def cleanup(
-    autograsper_thread: threading.Thread, monitor_thread: threading.Thread
+    autograsper: StackingAutograsper,
+    autograsper_thread: threading.Thread,
+    monitor_thread: threading.Thread,
 ) -> None:
     ERROR_EVENT.set()
+    autograsper.shutdown()
+    if shared_state.recorder:
+        shared_state.recorder.stop()
     autograsper_thread.join()
     monitor_thread.join()
     if shared_state.recorder_thread and shared_state.recorder_thread.is_alive():
@@ -291,17 +359,33 @@ def cleanup(
 
 
 def main():
-    args = parse_arguments()
-    autograsper, config, script_dir = initialize(args)
+    # Recorder and grasper threads already run OpenCV concurrently; keep each
+    # call single-threaded so OpenCV's own pool doesn't oversubscribe cores.
+    cv2.setNumThreads(1)
+
+    # Treat SIGTERM like Ctrl-C so both unwind through cleanup(), which wakes
+    # every blocked worker at once. Raising in the main thread is safer than
+    # setting events from a signal handler that may interrupt a held lock.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    log_listener = setup_logging()
+    # Stop the listener on every exit path, including setup failures, so
+    # records queued just before a crash are flushed rather than racing
+    # interpreter shutdown.
+    try:
+        args = parse_arguments()
+        autograsper, config, recorded_data_dir = initialize(args)
 
-    autograsper_thread, monitor_thread = start_threads(autograsper)
+        autograsper_thread, monitor_thread = start_threads(autograsper)
 
-    try:
-        handle_state_changes(autograsper, config, script_dir, args)
-    except Exception as e:
-        handle_error(e)
+        try:
+            handle_state_changes(autograsper, config, recorded_data_dir, args)
+        except Exception as e:
+            handle_error(e)
+        finally:
+            cleanup(autograsper, autograsper_thread, monitor_thread)
     finally:
-        cleanup(autograsper_thread, monitor_thread)
+        log_listener.stop()
 
 
 if __name__ == "__main__":
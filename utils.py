@@ -1,5 +1,7 @@
 import json
+import logging
 import os
+import threading
 import time
 from enum import Enum
 from typing import Any, List, Optional, Tuple
@@ -10,6 +12,35 @@ from pynput import keyboard
 from client.cloudgripper_client import GripperRobot
 from library.calibration import undistort
 
+logger = logging.getLogger(__name__)
+
+# Seconds a recorded order is given to settle before the next one is sent
+ORDER_SETTLE_TIME = 1
+
+# Indices into the manual_control pose vector
+_X, _Y, _Z, _ROTATION, _CLAW = range(5)
+
+# Per-axis bounds of the manual_control pose vector
+_POSE_LOW = np.array([0.0, 0.0, 0.0, -np.inf, 0.2])
+_POSE_HIGH = np.array([1.0, 1.0, 1.0, np.inf, 1.0])
+
+# Key -> (pose index, step) for manual_control
+_MANUAL_CONTROL_KEYS = {
+    "w": (_Y, 0.1),
+    "a": (_X, -0.1),
+    "s": (_Y, -0.1),
+    "x": (_Y, -0.05),
+    "z": (_Y, -0.01),
+    "d": (_X, 0.1),
+    "r": (_Z, 0.1),
+    "f": (_Z, -0.1),
+    "i": (_CLAW, 0.05),
+    "o": (_CLAW, 0.01),
+    "p": (_CLAW, -0.01),
+    "q": (_ROTATION, -10),
+    "e": (_ROTATION, 10),
+}
+
 
 class OrderType(Enum):
     MOVE_XY = 1
@@ -63,6 +94,7 @@ def execute_order(
     order: Tuple[OrderType, List[float]],
     output_dir: str,
     reverse_xy: bool = False,
+    settle: bool = True,
 ):
     """
     Execute a single order on the robot and save its state.
@@ -72,6 +104,7 @@ def execute_order(
     :param output_dir: Directory to save state data
     :param start_time: The start time of the autograsper process
     :param reverse_xy: If True, reverse the x and y coordinates (new_x = 1 - x, new_y = 1 - y)
+    :param settle: If False, skip the settle buffer after a recorded order
 
     BA reverse_xy is a temporary fix caused by the transfer from old to new API
     old API matrix transformations regarding position gathering from images is not updated
@@ -116,10 +149,11 @@ def execute_order(
         if output_dir != "":
             write_order(output_dir, start_time, order)
 
-            time.sleep(1)  # buffer time
+            if settle:
+                time.sleep(ORDER_SETTLE_TIME)  # buffer time
 
     except (IndexError, ValueError) as e:
-        print(f"Error executing order {order}: {e}")
+        logger.error("Error executing order %s: %s", order, e)
 
 
 def queue_orders(
@@ -128,19 +162,32 @@ def queue_orders(
     time_between_orders: float,
     output_dir: str = "",
     reverse_xy: bool = False,
+    shutdown_event: Optional[threading.Event] = None,
 ):
     """
     Queue a list of orders for the robot to execute sequentially and save state after each order.
 
     :param robot: The robot to execute the orders
     :param order_list: A list of tuples containing OrderType and the associated values
-    :param time_between_orders: Time to wait between executing orders
+    :param time_between_orders: Time from the start of one order to the start of the next,
+        not counting the settle buffer added when recording
     :param output_dir: Directory to save state data
     :param start_time: The start time of the autograsper process
+    :param shutdown_event: If set, remaining orders are skipped and waits end early
     """
+    if shutdown_event is None:
+        shutdown_event = threading.Event()
+
     for order in order_list:
-        execute_order(robot, order, output_dir, reverse_xy)
-        time.sleep(time_between_orders)
+        if shutdown_event.is_set():
+            break
+        order_start = time.monotonic()
+        execute_order(robot, order, output_dir, reverse_xy, settle=False)
+        elapsed = time.monotonic() - order_start
+        # The settle buffer stays outside the paced interval so recorded
+        # orders keep their full settle time on top of the spacing.
+        settle_time = ORDER_SETTLE_TIME if output_dir != "" else 0
+        shutdown_event.wait(settle_time + max(0.0, time_between_orders - elapsed))
 
 
 def queue_orders_with_input(
@@ -174,7 +221,7 @@ def queue_orders_with_input(
 
             execute_order(robot, order, output_dir)
         except (IndexError, ValueError) as e:
-            print(f"Error executing order {order}: {e}")
+            logger.error("Error executing order %s: %s", order, e)
 
 
 def snowflake_sweep(robot: GripperRobot):
@@ -207,7 +254,7 @@ def snowflake_sweep(robot: GripperRobot):
             order_list.append((OrderType.MOVE_XY, [0.5, 0.5]))
 
     queue_orders(robot, order_list, time_between_orders)
-    print("Snowflake sweep complete")
+    logger.info("Snowflake sweep complete")
 
 
 def sweep_straight(robot: GripperRobot):
@@ -230,7 +277,7 @@ def sweep_straight(robot: GripperRobot):
             order_list.append((OrderType.MOVE_XY, [x * 0.1, y_pos]))
 
     queue_orders(robot, order_list, time_between_orders)
-    print("Straight sweep complete")
+    logger.info("Straight sweep complete")
 
 
 def recover_gripper(robot: GripperRobot):
@@ -245,7 +292,7 @@ def recover_gripper(robot: GripperRobot):
         robot.gripper_close()
         time.sleep(1)
     except Exception as e:
-        print(f"Error recovering gripper: {e}")
+        logger.error("Error recovering gripper: %s", e)
 
 
 def generate_position_grid() -> np.ndarray:
@@ -342,102 +389,111 @@ def manual_control(robot):
     """
     Manually control the robot using keyboard inputs.
     """
-    current_x = 0.0
-    current_y = 0.0
-    current_z = 0.0
-    current_rotation = 0
-    current_angle = 0.4
+    pose = np.array([0.0, 0.0, 0.0, 0.0, 0.4])
+    xy = pose[_X : _Y + 1]
+
+    def send_xy():
+        robot.move_xy(*xy)
+
+    def send_z():
+        logger.debug("Z position: %s", pose[_Z])
+        robot.move_z(pose[_Z])
+
+    def send_rotation():
+        robot.rotate(int(pose[_ROTATION]))
+
+    def send_claw():
+        logger.debug("Claw position: %s", pose[_CLAW])
+        robot.move_gripper(pose[_CLAW])
+
+    senders = {
+        _X: send_xy,
+        _Y: send_xy,
+        _Z: send_z,
+        _ROTATION: send_rotation,
+        _CLAW: send_claw,
+    }
+
+    def nudge():
+        current_x, current_y = xy
+        robot.gripper_open()
+        time.sleep(1)
+        robot.move_z(0)
+        time.sleep(1)
+        robot.move_gripper(0.5)
+        time.sleep(1)
+        robot.move_z(1)
+        time.sleep(1)
+        robot.move_xy(min(current_x + 0.2, 1), min(current_y + 0.2, 1))
+        time.sleep(1)
+        robot.move_xy(current_x, current_y)
+        time.sleep(1)
+        robot.move_z(0)
+        time.sleep(1)
+
+    # Key presses only update the target pose; a single sender thread issues
+    # the robot calls, so autorepeat bursts collapse into the latest target.
+    pending = {}
+    pending_cv = threading.Condition()
+    stopped = False
+
+    def send_pending():
+        while True:
+            with pending_cv:
+                pending_cv.wait_for(lambda: pending or stopped)
+                # Drain what was queued before Esc, then exit
+                if stopped and not pending:
+                    return
+                actions = list(pending)
+                pending.clear()
+            for action in actions:
+                try:
+                    action()
+                except Exception as e:
+                    logger.error("Manual control error: %s", e)
 
     def on_press(key):
-        nonlocal current_x, current_y, current_z, current_rotation, current_angle
         try:
-            if key.char == "w":
-                current_y += 0.1
-                current_y = min(max(current_y, 0), 1)
-                robot.move_xy(current_x, current_y)
-            elif key.char == "a":
-                current_x -= 0.1
-                current_x = min(max(current_x, 0), 1)
-                robot.move_xy(current_x, current_y)
-            elif key.char == "s":
-                current_y -= 0.1
-                current_y = min(max(current_y, 0), 1)
-                robot.move_xy(current_x, current_y)
-            elif key.char == "x":
-                current_y -= 0.05
-                current_y = min(max(current_y, 0), 1)
-                robot.move_xy(current_x, current_y)
-            elif key.char == "z":
-                current_y -= 0.01
-                current_y = min(max(current_y, 0), 1)
-                robot.move_xy(current_x, current_y)
-            elif key.char == "d":
-                current_x += 0.1
-                current_x = min(max(current_x, 0), 1)
-                robot.move_xy(current_x, current_y)
-            elif key.char == "r":
-                current_z += 0.1
-                current_z = min(max(current_z, 0), 1)
-                print(current_z)
-                robot.move_z(current_z)
-            elif key.char == "f":
-                current_z -= 0.1
-                current_z = min(max(current_z, 0), 1)
-                print(current_z)
-                robot.move_z(current_z)
-            elif key.char == "i":
-                current_angle += 0.05
-                current_angle = min(current_angle, 1)
-                print(current_angle)
-                robot.move_gripper(current_angle)
-            elif key.char == "o":
-                current_angle += 0.01
-                current_angle = min(current_angle, 1)
-                print(current_angle)
-                robot.move_gripper(current_angle)
-            elif key.char == "p":
-                current_angle -= 0.01
-                current_angle = max(current_angle, 0.2)
-                print(current_angle)
-                robot.move_gripper(current_angle)
-            elif key.char == "q":
-                current_rotation -= 10
-                robot.rotate(current_rotation)
-            elif key.char == "e":
-                current_rotation += 10
-                robot.rotate(current_rotation)
-            elif key.char == "n":
-                robot.gripper_open()
-                time.sleep(1)
-                robot.move_z(0)
-                time.sleep(1)
-                robot.move_gripper(0.5)
-                time.sleep(1)
-                robot.move_z(1)
-                time.sleep(1)
-                robot.move_xy(min(current_x + 0.2, 1), min(current_y + 0.2, 1))
-                time.sleep(1)
-                robot.move_xy(current_x, current_y)
-                time.sleep(1)
-                robot.move_z(0)
-                time.sleep(1)
+            if key.char == "n":
+                action = nudge
+            else:
+                command = _MANUAL_CONTROL_KEYS.get(key.char)
+                if command is None:
+                    return
+                axis, delta = command
+                with pending_cv:
+                    pose[axis] += delta
+                    np.clip(pose, _POSE_LOW, _POSE_HIGH, out=pose)
+                action = senders[axis]
+            with pending_cv:
+                pending[action] = None
+                pending_cv.notify()
         except Exception as e:
-            print(e)
+            logger.error("Manual control error: %s", e)
 
     def on_release(key):
         if key == keyboard.Key.esc:
             # Stop listener
             return False
 
+    sender = threading.Thread(target=send_pending, daemon=True)
+    sender.start()
     with keyboard.Listener(on_press=on_press, on_release=on_release) as listener:
         listener.join()
 
+    with pending_cv:
+        stopped = True
+        pending_cv.notify()
+    sender.join()
+
 
-def clear_center(robot):
+def clear_center(robot, shutdown_event: Optional[threading.Event] = None):
     """
     Clear the center area of the workspace.
+
+    :param shutdown_event: If set, remaining clearing moves are skipped
     """
-    print("clearing center")
+    logger.info("clearing center")
     commands = [
         (OrderType.MOVE_Z, [1]),
         (OrderType.GRIPPER_CLOSE, []),
@@ -459,5 +515,5 @@ def clear_center(robot):
         (OrderType.MOVE_Z, [1]),
     ]
 
-    queue_orders(robot, commands, 1)
-    print("clearing center complete")
+    queue_orders(robot, commands, 1, shutdown_event=shutdown_event)
+    logger.info("clearing center complete")